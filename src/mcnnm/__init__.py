@@ -1,4 +1,4 @@
-from .utils import convert_inputs, generate_data
+from .utils import convert_inputs, enable_x64, generate_data
 from .wrappers import MCNNMResults, complete_matrix, estimate
 
-__all__ = ["estimate", "complete_matrix", "generate_data", "convert_inputs", "MCNNMResults"]
+__all__ = ["estimate", "complete_matrix", "generate_data", "convert_inputs", "enable_x64", "MCNNMResults"]
@@ -1,3 +1,4 @@
+from functools import partial
 from typing import cast
 
 import jax
@@ -5,11 +6,16 @@ import jax.debug as jdb
 import jax.numpy as jnp
 from jax import jit, lax
 
-from .core_utils import element_wise_l1_norm, is_positive_definite, mask_observed
+from .core_utils import (
+    element_wise_l1_norm,
+    is_positive_definite,
+    mask_observed,
+    masked_frobenius_norm_sq,
+    nuclear_norm,
+    spectral_norm,
+)
 from .types import Array, Scalar
 
-jax.config.update("jax_enable_x64", True)
-
 
 @jit
 def initialize_coefficients(Y: Array, X_tilde: Array, Z_tilde: Array, V: Array) -> tuple[Array, Array, Array, Array]:
@@ -113,10 +119,11 @@ def svt(U: Array, V: Array, sing_vals: Array, threshold: Scalar) -> Array:
         Array: The thresholded low-rank matrix.
     """
     soft_thresholded_sing_vals = jnp.maximum(sing_vals - threshold, 0)
-    return U @ jnp.diag(soft_thresholded_sing_vals) @ V.T
+    # Scale the columns of U instead of forming the diagonal matrix and multiplying by it
+    return (U * soft_thresholded_sing_vals) @ V.T
 
 
-@jit
+@partial(jit, static_argnames=("use_unit_fe",))
 def update_unit_fe(
     Y: Array,
     X_tilde: Array,
@@ -126,6 +133,7 @@ def update_unit_fe(
     L: Array,
     time_fe: Array,
     use_unit_fe: bool,
+    covariate_contribution: Array | None = None,
 ) -> Array:
     """
     Update the unit fixed effects in the coordinate descent algorithm when covariates are available.
@@ -151,12 +159,15 @@ def update_unit_fe(
         L (Array): The low-rank matrix of shape (N, T).
         time_fe (Array): The time fixed effects vector of shape (T,).
         use_unit_fe (bool): Whether to estimate unit fixed effects.
+        covariate_contribution (Optional[Array]): The precomputed covariate contribution
+            :math:`\tilde{X}\tilde{H}\tilde{Z}^T` of shape (N, T). Computed from the inputs if None.
 
     Returns:
         Array: The updated unit fixed effects vector of shape (N,) if use_unit_fe is True, else a zero vector.
     """
     # Compute the covariate contribution to the predicted outcomes
-    covariate_contribution = jnp.einsum("np,pq,tq->nt", X_tilde, H_tilde, Z_tilde)
+    if covariate_contribution is None:
+        covariate_contribution = jnp.einsum("np,pq,tq->nt", X_tilde, H_tilde, Z_tilde)
 
     # Calculate the total predicted outcomes (without unit fixed effects)
     Y_hat = covariate_contribution + L + time_fe
@@ -178,10 +189,10 @@ def update_unit_fe(
     )
 
     # Return the updated unit fixed effects if use_unit_fe is True, else return zeros
-    return jnp.where(use_unit_fe, average_residuals, jnp.zeros_like(average_residuals))
+    return average_residuals if use_unit_fe else jnp.zeros_like(average_residuals)
 
 
-@jit
+@partial(jit, static_argnames=("use_time_fe",))
 def update_time_fe(
     Y: Array,
     X_tilde: Array,
@@ -191,6 +202,7 @@ def update_time_fe(
     L: Array,
     unit_fe: Array,
     use_time_fe: bool,
+    covariate_contribution: Array | None = None,
 ) -> Array:
     """
     Update the time fixed effects in the coordinate descent algorithm when covariates are available.
@@ -216,12 +228,15 @@ def update_time_fe(
         L (Array): The low-rank matrix of shape (N, T).
         unit_fe (Array): The unit fixed effects vector of shape (N,).
         use_time_fe (bool): Whether to estimate time fixed effects.
+        covariate_contribution (Optional[Array]): The precomputed covariate contribution
+            :math:`\tilde{X}\tilde{H}\tilde{Z}^T` of shape (N, T). Computed from the inputs if None.
 
     Returns:
         Array: The updated time fixed effects vector of shape (T,) if use_time_fe is True, else a zero vector.
     """
     # Compute the covariate contribution to Y hat
-    covariate_contribution = jnp.einsum("np,pq,tq->nt", X_tilde, H_tilde, Z_tilde)
+    if covariate_contribution is None:
+        covariate_contribution = jnp.einsum("np,pq,tq->nt", X_tilde, H_tilde, Z_tilde)
 
     # Calculate the total predicted outcomes (without time fixed effects)
     Y_hat = covariate_contribution + L + jnp.expand_dims(unit_fe, axis=1)
@@ -243,7 +258,7 @@ def update_time_fe(
     )
 
     # Return the updated time fixed effects if use_time_fe is True, else return zeros
-    return jnp.where(use_time_fe, average_residuals, jnp.zeros_like(average_residuals))
+    return average_residuals if use_time_fe else jnp.zeros_like(average_residuals)
 
 
 @jit
@@ -257,6 +272,7 @@ def update_beta(
     L: Array,
     unit_fe: Array,
     time_fe: Array,
+    covariate_contribution: Array | None = None,
 ) -> Array:
     """
     Update the unit-time-specific covariate coefficients (beta) in the coordinate descent algorithm.
@@ -283,12 +299,15 @@ def update_beta(
         L (Array): The low-rank matrix of shape (N, T).
         unit_fe (Array): The unit fixed effects vector of shape (N,).
         time_fe (Array): The time fixed effects vector of shape (T,).
+        covariate_contribution (Optional[Array]): The precomputed covariate contribution
+            :math:`\tilde{X}\tilde{H}\tilde{Z}^T` of shape (N, T). Computed from the inputs if None.
 
     Returns:
         Array: The updated unit-time-specific covariate coefficients vector of shape (J,).
     """
     # Compute the covariate contribution to Y hat
-    covariate_contribution = jnp.einsum("np,pq,tq->nt", X_tilde, H_tilde, Z_tilde)
+    if covariate_contribution is None:
+        covariate_contribution = jnp.einsum("np,pq,tq->nt", X_tilde, H_tilde, Z_tilde)
 
     # Calculate Y hat (without V*beta)
     Y_hat = covariate_contribution + L + jnp.expand_dims(unit_fe, axis=1) + time_fe
@@ -299,14 +318,13 @@ def update_beta(
     # Apply the observation mask to the residuals
     masked_residuals = mask_observed(residuals, W)
 
-    # Apply the observation mask to the unit-time-specific covariates
-    masked_V = V * jnp.expand_dims(W, axis=-1)
-
-    # Sum of masked unit-time-specific covariates for each covariate
-    V_sums = jnp.sum(masked_V, axis=(0, 1))
+    # Sum of masked unit-time-specific covariates for each covariate. The mask is contracted directly
+    # against V, so the masked (N, T, J) tensor is never materialized
+    V_sums = jnp.einsum("ntj,nt->j", V, W)
 
-    # Compute the product of masked residuals and masked unit-time-specific covariates
-    V_residual_products = jnp.einsum("ntj,nt->j", masked_V, masked_residuals)
+    # Compute the product of masked residuals and unit-time-specific covariates; the residuals are
+    # already masked, so V needs no masking of its own
+    V_residual_products = jnp.einsum("ntj,nt->j", V, masked_residuals)
 
     # Calculate updated beta coefficients, avoiding division by zero
     updated_beta = jnp.where(V_sums > 0, -V_residual_products / (V_sums + 1e-8), 0.0)
@@ -314,7 +332,7 @@ def update_beta(
     return updated_beta
 
 
-@jit
+@partial(jit, static_argnames=("use_unit_fe", "use_time_fe"))
 def compute_Y_hat(
     L: Array,
     X_tilde: Array,
@@ -366,20 +384,20 @@ def compute_Y_hat(
     Returns:
         Array: The estimated matrix :math:`\hat{Y}` of shape (N, T).
     """
-    N, T = L.shape
+    N = L.shape[0]
     P = X_tilde.shape[1]  # Number of unit-specific covariates
     Q = Z_tilde.shape[1]  # Number of time-specific covariates
 
     # Start with the low-rank component
     Y_hat = L
 
-    # Add unit FEs
-    unit_fe_term = jnp.outer(gamma, jnp.ones(T))
-    Y_hat += jnp.where(use_unit_fe, unit_fe_term, jnp.zeros_like(unit_fe_term))
+    # Add unit FEs, broadcast across time periods. The flags are static, so disabled terms are not traced
+    if use_unit_fe:
+        Y_hat += gamma[:, None]
 
-    # Add time FEs
-    time_fe_term = jnp.outer(jnp.ones(N), delta)
-    Y_hat += jnp.where(use_time_fe, time_fe_term, jnp.zeros_like(time_fe_term))
+    # Add time FEs, broadcast across units
+    if use_time_fe:
+        Y_hat += delta[None, :]
 
     if Q > 0:
         Y_hat += X_tilde @ H_tilde[:P, :Q] @ Z_tilde.T
@@ -387,8 +405,9 @@ def compute_Y_hat(
         Y_hat += X_tilde @ H_tilde[:P, Q:]
     if H_tilde.shape[0] >= P + N and Q > 0:
         Y_hat += H_tilde[P : P + N, :Q] @ Z_tilde.T
-    V_beta_term = jnp.einsum("ntj,j->nt", V, beta)
-    Y_hat += V_beta_term
+    if V.shape[2] > 0:
+        V_beta_term = jnp.einsum("ntj,j->nt", V, beta)
+        Y_hat += V_beta_term
 
     return Y_hat
 
@@ -477,17 +496,19 @@ def compute_objective_value(
     error_matrix = Y_hat - Y
 
     if inv_omega is None:
-        inv_omega = jnp.eye(Y.shape[1])
-
-    lax.cond(
-        is_positive_definite(inv_omega),
-        lambda _: None,
-        lambda _: jdb.print("WARNING: inv_omega is not positive definite"),
-        None,
-    )
+        # With an identity weighting the quadratic form reduces to the squared Frobenius norm
+        weighted_error_term = (1 / train_size) * masked_frobenius_norm_sq(error_matrix, W)
+    else:
+        lax.cond(
+            is_positive_definite(inv_omega),
+            lambda _: None,
+            lambda _: jdb.print("WARNING: inv_omega is not positive definite"),
+            None,
+        )
 
-    error_mask = mask_observed(error_matrix, W)  # mask the error matrix
-    weighted_error_term = (1 / train_size) * jnp.trace(error_mask @ inv_omega @ error_mask.T)
+        error_mask = mask_observed(error_matrix, W)  # mask the error matrix
+        # trace(E @ inv_omega @ E.T) without forming the (N, N) product, of which only the diagonal is needed
+        weighted_error_term = (1 / train_size) * jnp.sum((error_mask @ inv_omega) * error_mask)
 
     L_regularization_term = lambda_L * sum_sing_vals
 
@@ -498,7 +519,7 @@ def compute_objective_value(
     return obj_val
 
 
-@jit
+@partial(jit, static_argnames=("use_unit_fe", "use_time_fe", "verbose"))
 def initialize_fixed_effects_and_H(
     Y: Array,
     L: Array,
@@ -551,24 +572,21 @@ def initialize_fixed_effects_and_H(
 
     H_rows, H_cols = X_tilde.shape[1], Z_tilde.shape[1]
 
+    # H_tilde is not updated during initialization, so its contribution is computed once
+    covariate_contribution = jnp.einsum("np,pq,tq->nt", X_tilde, H_tilde, Z_tilde)
+
     def cond_fun(carry):
         obj_val, prev_obj_val, _, _, i = carry
-        rel_error = jnp.where(
-            jnp.isfinite(prev_obj_val),
-            (obj_val - prev_obj_val) / (jnp.abs(prev_obj_val) + 1e-8),
-            jnp.inf,
-        )
-        return lax.cond(
-            ((rel_error < rel_tol) & (rel_error > 0)),
-            lambda _: False,
-            lambda _: i < niter,
-            None,
-        )
+        # Relative change test with the (positive) denominator moved to the right-hand side
+        scale = jnp.abs(prev_obj_val) + 1e-8
+        change = obj_val - prev_obj_val
+        converged = jnp.isfinite(prev_obj_val) & (change < rel_tol * scale) & (change > 0)
+        return ~converged & (i < niter)
 
     def body_fun(carry):
         obj_val, prev_obj_val, gamma, delta, i = carry
-        gamma = update_unit_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, delta, use_unit_fe)
-        delta = update_time_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, gamma, use_time_fe)
+        gamma = update_unit_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, delta, use_unit_fe, covariate_contribution)
+        delta = update_time_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, gamma, use_time_fe, covariate_contribution)
 
         new_obj_val = compute_objective_value(
             Y,
@@ -595,8 +613,7 @@ def initialize_fixed_effects_and_H(
 
     Y_hat = compute_Y_hat(L, X_tilde, Z_tilde, V, H_tilde, gamma, delta, beta, use_unit_fe, use_time_fe)
     masked_error_matrix = mask_observed(Y - Y_hat, W)
-    s = jnp.linalg.svd(masked_error_matrix, compute_uv=False)
-    lambda_L_max = 2.0 * jnp.max(s) / num_train
+    lambda_L_max = 2.0 * spectral_norm(masked_error_matrix) / num_train
     lambda_L_max = cast("Scalar", lambda_L_max)  # type: ignore[assignment]
 
     T_mat = jnp.zeros((Y.size, H_rows * H_cols))
@@ -618,17 +635,13 @@ def initialize_fixed_effects_and_H(
     # Truncate the value to 5 decimal places for printing
     truncated_ov = jnp.round(obj_val, decimals=5)
 
-    lax.cond(
-        verbose,
-        lambda _: jdb.print("Initialization complete, objective value: {ov}", ov=truncated_ov),
-        lambda _: None,
-        None,
-    )
+    if verbose:
+        jdb.print("Initialization complete, objective value: {ov}", ov=truncated_ov)
 
     return gamma, delta, beta, H_tilde, T_mat, in_prod_T, in_prod, lambda_L_max, lambda_H_max
 
 
-@jit
+@partial(jit, static_argnames=("use_unit_fe", "use_time_fe"))
 def update_H(
     Y: Array,
     X_tilde: Array,
@@ -646,6 +659,7 @@ def update_H(
     lambda_H: Scalar,
     use_unit_fe: bool,
     use_time_fe: bool,
+    num_train: Scalar | None = None,
 ) -> tuple[Array, Array]:
     """
     Update the covariate coefficients matrix H_tilde in the coordinate descent algorithm.
@@ -671,6 +685,7 @@ def update_H(
         lambda_H (Scalar): The regularization parameter for the element-wise L1 norm of H_tilde.
         use_unit_fe (bool): Whether to include unit fixed effects in the decomposition.
         use_time_fe (bool): Whether to include time fixed effects in the decomposition.
+        num_train (Optional[Scalar]): The precomputed number of observed entries of W. Computed from W if None.
 
     Returns:
         Tuple[Array, Array]: A tuple containing the updated covariate coefficients matrix H_tilde and the updated inner
@@ -678,7 +693,10 @@ def update_H(
     """
     # Get dimensions of the covariate coefficients matrix
     coeff_rows, coeff_cols = X_tilde.shape[1], Z_tilde.shape[1]
-    num_observed = jnp.sum(W)
+
+    # Count the number of observed entries
+    if num_train is None:
+        num_train = jnp.sum(W)
 
     # Compute the current predicted outcomes
     Y_hat = compute_Y_hat(L, X_tilde, Z_tilde, V, H_tilde, unit_fe, time_fe, beta, use_unit_fe, use_time_fe)
@@ -686,7 +704,7 @@ def update_H(
     # Compute the residuals
     error_matrix = Y - Y_hat
     masked_error_matrix = mask_observed(error_matrix, W)
-    residuals = masked_error_matrix / jnp.sqrt(num_observed)
+    residuals = masked_error_matrix / jnp.sqrt(num_train)
     residuals_flat = residuals.ravel()
 
     # Flatten the covariate coefficients matrix
@@ -697,47 +715,29 @@ def update_H(
     num_unit_covariates = X_tilde.shape[1] - Y.shape[0]
     num_time_covariates = Z_tilde.shape[1] - Y.shape[1]
 
+    # The residuals are fixed during the sweep, so project them onto the swept columns of T_mat at once.
+    # Without unit-specific covariates only the time-specific block of coefficients is swept.
+    num_swept = coeff_rows * coeff_cols if num_unit_covariates > 0 else num_time_covariates * coeff_rows
+    residual_projections = T_mat[:, :num_swept].T @ residuals_flat
+
     def update_coefficient(carry, idx):
         """Update a single coefficient using soft-thresholding."""
         current_in_prod, current_coeffs = carry
         U = in_prod_T[idx]
-        current_in_prod_flat = current_in_prod.ravel()
+        T_col = T_mat[:, idx]
+
+        # Correlation of T_col with the partial residual that excludes this coefficient's own contribution
+        partial_corr = residual_projections[idx] - jnp.dot(current_in_prod.ravel(), T_col) + U * current_coeffs[idx]
 
         # Compute the update using soft-thresholding
         new_coeff = jnp.where(
             U != 0,
-            0.5
-            * (
-                jnp.maximum(
-                    (
-                        2
-                        * jnp.dot(
-                            residuals_flat - current_in_prod_flat + T_mat[:, idx] * current_coeffs[idx],
-                            T_mat[:, idx],
-                        )
-                        - lambda_H
-                    )
-                    / U,
-                    0,
-                )
-                - jnp.maximum(
-                    (
-                        -2
-                        * jnp.dot(
-                            residuals_flat - current_in_prod_flat + T_mat[:, idx] * current_coeffs[idx],
-                            T_mat[:, idx],
-                        )
-                        - lambda_H
-                    )
-                    / U,
-                    0,
-                )
-            ),
+            jnp.sign(partial_corr) * jnp.maximum(2 * jnp.abs(partial_corr) - lambda_H, 0) / (2 * U),
             0,
         )
 
         # Update the inner product
-        current_in_prod += (new_coeff - current_coeffs[idx]) * T_mat[:, idx].reshape(current_in_prod.shape)
+        current_in_prod += (new_coeff - current_coeffs[idx]) * T_col.reshape(current_in_prod.shape)
         current_coeffs = current_coeffs.at[idx].set(new_coeff)
         return (current_in_prod, current_coeffs), None
 
@@ -763,7 +763,7 @@ def update_H(
     return updated_H_tilde, updated_in_prod
 
 
-@jit
+@partial(jit, static_argnames=("use_unit_fe", "use_time_fe"))
 def update_L(
     Y: Array,
     X_tilde: Array,
@@ -778,6 +778,7 @@ def update_L(
     lambda_L: Scalar,
     use_unit_fe: bool,
     use_time_fe: bool,
+    num_train: Scalar | None = None,
 ) -> tuple[Array, Array]:
     """
     Update the low-rank matrix L in the coordinate descent algorithm.
@@ -796,12 +797,14 @@ def update_L(
         lambda_L (Scalar): The regularization parameter for the nuclear norm of L.
         use_unit_fe (bool): Whether to include unit fixed effects in the decomposition.
         use_time_fe (bool): Whether to include time fixed effects in the decomposition.
+        num_train (Optional[Scalar]): The precomputed number of observed entries of W. Computed from W if None.
 
     Returns:
         Tuple[Array, Array]: A tuple containing the updated low-rank matrix L and the singular values.
     """
     # Count the number of observed entries
-    num_train = jnp.sum(W)
+    if num_train is None:
+        num_train = jnp.sum(W)
 
     # Compute the current predicted outcomes
 
@@ -829,7 +832,7 @@ def update_L(
     return L_updated, singular_values
 
 
-@jit
+@partial(jit, static_argnames=("use_unit_fe", "use_time_fe", "verbose", "print_iters"))
 def fit(
     Y: Array,
     X_tilde: Array,
@@ -914,8 +917,7 @@ def fit(
     """
     obj_val = jnp.inf
 
-    _, singular_values, _ = jnp.linalg.svd(L, full_matrices=False)
-    sum_sigma = jnp.sum(singular_values)
+    sum_sigma = nuclear_norm(L)
 
     obj_val = compute_objective_value(  # type: ignore[assignment]
         Y,
@@ -936,26 +938,31 @@ def fit(
         inv_omega=Omega_inv,
     )
 
+    # W is fixed for the whole fit, so the number of observed entries is counted once
+    num_train = jnp.sum(W)
+
     def cond_fun(carry):
         obj_val, prev_obj_val, *_ = carry
-        # rel_error = (obj_val - prev_obj_val) / (jnp.abs(prev_obj_val))
-        rel_error = jnp.where(
-            jnp.isfinite(obj_val),
-            (obj_val - prev_obj_val) / (jnp.abs(prev_obj_val) + 1e-8),
-            jnp.inf,
-        )
-        return lax.cond(
-            (rel_error < rel_tol) & (rel_error > -0.5),  # Allow for slightly negative relative error
-            lambda _: False,
-            lambda _: carry[-1] < niter,
-            None,
+        # Relative change test with the (positive) denominator moved to the right-hand side,
+        # which avoids a division per iteration
+        scale = jnp.abs(prev_obj_val) + 1e-8
+        change = obj_val - prev_obj_val
+        converged = (
+            jnp.isfinite(obj_val)
+            & (change < rel_tol * scale)
+            & (change > -0.5 * scale)  # Allow for slightly negative relative error
         )
+        return ~converged & (carry[-1] < niter)
 
     def body_fun(carry):
         obj_val, prev_obj_val, gamma, delta, beta, L, H_tilde, in_prod, i = carry
-        gamma = update_unit_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, delta, use_unit_fe)
-        delta = update_time_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, gamma, use_time_fe)
-        beta = update_beta(Y, X_tilde, Z_tilde, V, H_tilde, W, L, gamma, delta)
+        # H_tilde is unchanged until update_H, so the fixed effect and beta updates share its contribution
+        covariate_contribution = jnp.einsum("np,pq,tq->nt", X_tilde, H_tilde, Z_tilde)
+        gamma = update_unit_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, delta, use_unit_fe, covariate_contribution)
+        delta = update_time_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, gamma, use_time_fe, covariate_contribution)
+        # The number of unit-time covariates is a static shape, so with none the beta update is not traced at all
+        if V.shape[2] > 0:
+            beta = update_beta(Y, X_tilde, Z_tilde, V, H_tilde, W, L, gamma, delta, covariate_contribution)
         H_tilde, in_prod = update_H(
             Y,
             X_tilde,
@@ -973,6 +980,7 @@ def fit(
             lambda_H,
             use_unit_fe,
             use_time_fe,
+            num_train,
         )
 
         L, singular_values = update_L(
@@ -989,6 +997,7 @@ def fit(
             lambda_L,
             use_unit_fe,
             use_time_fe,
+            num_train,
         )
 
         sum_sigma = jnp.sum(singular_values)
@@ -1012,12 +1021,8 @@ def fit(
             inv_omega=Omega_inv,
         )
 
-        lax.cond(
-            print_iters,
-            lambda _: jax.debug.print("Iteration {i}: {ov}", i=i, ov=new_obj_val),
-            lambda _: None,
-            operand=None,
-        )
+        if print_iters:
+            jax.debug.print("Iteration {i}: {ov}", i=i, ov=new_obj_val)
         return new_obj_val, obj_val, gamma, delta, beta, L, H_tilde, in_prod, i + 1
 
     init_val = (
@@ -1040,18 +1045,14 @@ def fit(
     #     None,
     # )
 
-    lax.cond(
-        verbose,
-        lambda _: jax.debug.print(
+    if verbose:
+        jax.debug.print(
             "Terminated at iteration {term_iter}: for lambda_L= {lam_L}, lambda_H= {lam_H}, "
             "objective function value= {obj_val}",
             term_iter=term_iter,
             lam_L=lambda_L,
             lam_H=lambda_H,
             obj_val=obj_val,
-        ),
-        lambda _: None,
-        operand=None,
-    )
+        )
 
     return H, L, gamma, delta, beta, in_prod, obj_val
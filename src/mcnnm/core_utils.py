@@ -1,12 +1,9 @@
-import jax
 import jax.numpy as jnp
+import numpy as np
 from jax import jit
-from jax.numpy.linalg import norm
 
 from .types import Array, Scalar
 
-jax.config.update("jax_enable_x64", True)
-
 
 @jit
 def is_positive_definite(mat: jnp.ndarray) -> bool:
@@ -19,31 +16,46 @@ def is_positive_definite(mat: jnp.ndarray) -> bool:
     Returns:
         bool: True if the matrix is positive definite, False otherwise.
 
-    This function checks if a matrix is positive definite by computing its eigenvalues
-    and checking if they are all positive.
+    This function checks if a matrix is positive definite by attempting a Cholesky factorization.
+    JAX signals a failed factorization with NaNs instead of raising, so the matrix is positive
+    definite if and only if all diagonal entries of the Cholesky factor are finite and positive.
     """
-    # Compute the eigenvalues of the matrix
-    eigenvalues = jnp.linalg.eigvalsh(mat)
+    # Attempt the Cholesky factorization of the matrix
+    chol_diag = jnp.diagonal(jnp.linalg.cholesky(mat))
 
-    # Check if all eigenvalues are positive
-    return jax.lax.cond(jnp.min(eigenvalues) > 0, lambda _: True, lambda _: False, operand=None)
+    # Check if the factorization succeeded with a strictly positive diagonal
+    return jnp.all(jnp.isfinite(chol_diag) & (chol_diag > 0))
+
+
+def _check_mask_shapes(A: Array, mask: Array) -> None:
+    """Raise a ValueError unless A and mask share their trailing (N, T) dimensions and broadcast."""
+    try:
+        np.broadcast_shapes(A.shape[:-2], mask.shape[:-2])
+    except ValueError:
+        raise ValueError(f"The shapes of A ({A.shape}) and mask ({mask.shape}) do not match.") from None
+    if A.shape[-2:] != mask.shape[-2:]:
+        raise ValueError(f"The shapes of A ({A.shape}) and mask ({mask.shape}) do not match.")
 
 
-@jit
 def mask_observed(A: Array, mask: Array) -> Array:
     r"""
     Projects the matrix A onto the observed entries specified by the binary mask.
     Corresponds to :math:`P_{\mathcal{O}}` in the paper.
 
+    A and mask may carry leading batch dimensions (e.g. a stack of fold masks) as long as their trailing
+    (N, T) dimensions match; the leading dimensions are broadcast against each other.
+    The function is not jitted, so inside a jitted caller the multiply fuses with the surrounding operations.
+
     Args:
-        A: The input matrix.
+        A: The input matrix, or a stack of matrices.
         mask: The binary mask matrix, where 1 indicates an observed entry and 0 indicates an unobserved entry.
 
     Returns:
         Array: The projected matrix.
 
     Raises:
-        ValueError: If the shapes of A and mask do not match.
+        ValueError: If the trailing matrix dimensions of A and mask do not match, or their leading
+            dimensions cannot be broadcast.
 
     .. math::
 
@@ -51,26 +63,29 @@ def mask_observed(A: Array, mask: Array) -> Array:
 
     where :math:`\odot` denotes the element-wise product.
     """
-    if A.shape != mask.shape:
-        raise ValueError(f"The shapes of A ({A.shape}) and mask ({mask.shape}) do not match.")
+    _check_mask_shapes(A, mask)
     return A * mask
 
 
-@jit
 def mask_unobserved(A: Array, mask: Array) -> Array:
     r"""
     Projects the matrix A onto the unobserved entries specified by the binary mask.
     Corresponds to :math:`P_{\mathcal{O}}^\perp` in the paper.
 
+    A and mask may carry leading batch dimensions (e.g. a stack of fold masks) as long as their trailing
+    (N, T) dimensions match; the leading dimensions are broadcast against each other.
+    The function is not jitted, so inside a jitted caller the multiply fuses with the surrounding operations.
+
     Args:
-        A: The input matrix.
+        A: The input matrix, or a stack of matrices.
         mask: The binary mask matrix, where 1 indicates an observed entry and 0 indicates an unobserved entry.
 
     Returns:
         Array: The projected matrix.
 
     Raises:
-        ValueError: If the shapes of A and mask do not match.
+        ValueError: If the trailing matrix dimensions of A and mask do not match, or their leading
+            dimensions cannot be broadcast.
 
     .. math::
 
@@ -78,16 +93,22 @@ def mask_unobserved(A: Array, mask: Array) -> Array:
 
     where :math:`\odot` denotes the element-wise product and :math:`\mathbf{1}` is a matrix of 1s.
     """
-    if A.shape != mask.shape:
-        raise ValueError(f"The shapes of A ({A.shape}) and mask ({mask.shape}) do not match.")
-    return jnp.where(mask, jnp.zeros_like(A), A)
+    _check_mask_shapes(A, mask)
+    return A * (1 - mask.astype(A.dtype))
 
 
 @jit
+def _frobenius_norm(A: Array) -> Scalar:
+    return jnp.sqrt(jnp.sum(A * A))
+
+
 def frobenius_norm(A: Array) -> Scalar:
     """
     Computes the Frobenius norm of a matrix A.
 
+    NumPy inputs are reduced with NumPy directly, which avoids the cost of dispatching a jitted kernel
+    for the small matrices typical of validation.
+
     Args:
         A: The input matrix.
 
@@ -99,7 +120,9 @@ def frobenius_norm(A: Array) -> Scalar:
     """
     if A.ndim != 2:
         raise ValueError("Input must be a 2D array.")
-    return norm(A, ord="fro")
+    if isinstance(A, np.ndarray):
+        return np.sqrt(np.sum(A * A))
+    return _frobenius_norm(A)
 
 
 @jit
@@ -118,15 +141,52 @@ def nuclear_norm(A: Array) -> Scalar:
     """
     if A.ndim != 2:
         raise ValueError("Input must be a 2D array.")
-    _, s, _ = jnp.linalg.svd(A, full_matrices=False)
+    s = jnp.linalg.svd(A, full_matrices=False, compute_uv=False)
     return jnp.sum(s)
 
 
 @jit
+def spectral_norm(A: Array) -> Scalar:
+    """
+    Computes the spectral norm (largest singular value) of a matrix A.
+
+    For matrices that are far from square (one dimension at least twice the other), the value is
+    obtained from the largest eigenvalue of the smaller Gram matrix instead of an SVD of A. Unlike
+    the small eigenvalues, the largest one is computed to full relative accuracy, so the shortcut
+    is safe here.
+
+    Args:
+        A: The input matrix.
+
+    Returns:
+        Scalar: The spectral norm of the matrix A.
+
+    Raises:
+        ValueError: If the input is not a 2D array.
+    """
+    if A.ndim != 2:
+        raise ValueError("Input must be a 2D array.")
+    m, n = A.shape
+    if min(m, n) > 0 and max(m, n) >= 2 * min(m, n):
+        gram = A.T @ A if m >= n else A @ A.T
+        # eigvalsh returns the eigenvalues in ascending order
+        return jnp.sqrt(jnp.clip(jnp.linalg.eigvalsh(gram)[-1], 0.0))
+    s = jnp.linalg.svd(A, full_matrices=False, compute_uv=False)
+    return jnp.max(s)
+
+
+@jit
+def _element_wise_l1_norm(A: Array) -> Scalar:
+    return jnp.sum(jnp.abs(A))
+
+
 def element_wise_l1_norm(A: Array) -> Scalar:
     """
     Computes the element-wise L1 norm of a matrix A.
 
+    NumPy inputs are reduced with NumPy directly, which avoids the cost of dispatching a jitted kernel
+    for the small matrices typical of validation.
+
     Args:
         A: The input matrix.
 
@@ -138,7 +198,32 @@ def element_wise_l1_norm(A: Array) -> Scalar:
     """
     if A.ndim != 2:
         raise ValueError("Input must be a 2D array.")
-    return jnp.sum(jnp.abs(A))
+    if isinstance(A, np.ndarray):
+        return np.sum(np.abs(A))
+    return _element_wise_l1_norm(A)
+
+
+@jit
+def masked_frobenius_norm_sq(A: Array, mask: Array) -> Scalar:
+    r"""
+    Computes the squared Frobenius norm of the observed entries of a matrix A.
+
+    This is equivalent to ``frobenius_norm(mask_observed(A, mask)) ** 2``, but masks, squares and
+    reduces in a single pass so the projected matrix is never materialized.
+
+    Args:
+        A: The input matrix.
+        mask: The binary mask matrix, where 1 indicates an observed entry and 0 indicates an unobserved entry.
+
+    Returns:
+        Scalar: The squared Frobenius norm of :math:`P_{\mathcal{O}}(A)`.
+
+    Raises:
+        ValueError: If the shapes of A and mask do not match.
+    """
+    if A.shape != mask.shape:
+        raise ValueError(f"The shapes of A ({A.shape}) and mask ({mask.shape}) do not match.")
+    return jnp.sum(jnp.where(mask, A * A, 0))
 
 
 @jit
@@ -146,14 +231,17 @@ def normalize(mat: Array) -> tuple[Array, Array]:
     """
     Normalize the columns of the input matrix.
     Return the normalized matrix and the column norms.
+    The column reduction and scaling are a single fused pass; memory layout is chosen by XLA,
+    so there is no need to pass column-major (Fortran-ordered) inputs.
     """
     if mat.size == 0:
         col_norms = jnp.zeros(mat.shape[1])
         mat_norm = jnp.zeros_like(mat)
     else:
+        # Clamp instead of shifting so that nonzero columns keep their exact norms
         epsilon = 1e-10
-        col_norms = jnp.linalg.norm(mat, axis=0) + epsilon
-        mat_norm = mat / col_norms
+        col_norms = jnp.maximum(jnp.sqrt(jnp.sum(mat * mat, axis=0)), epsilon)
+        mat_norm = mat * (1.0 / col_norms)[None, :]
 
     return mat_norm, col_norms
 
@@ -162,13 +250,10 @@ def normalize(mat: Array) -> tuple[Array, Array]:
 def normalize_back(mat: Array, row_scales: Array, col_scales: Array) -> Array:
     """
     Rescale the rows and columns of the matrix H using the provided scales.
+    Empty scale vectors leave the corresponding dimension unscaled.
     """
-    mat_new = mat.copy()
-
-    if row_scales.size > 0:
-        mat_new /= row_scales[:, None]
-
-    if col_scales.size > 0:
-        mat_new /= col_scales[None, :]
+    # Empty scales are known at trace time, so substitute ones to keep a single fused expression
+    inv_row_scales = 1.0 / row_scales if row_scales.size > 0 else jnp.ones(mat.shape[0])
+    inv_col_scales = 1.0 / col_scales if col_scales.size > 0 else jnp.ones(mat.shape[1])
 
-    return mat_new
+    return mat * inv_row_scales[:, None] * inv_col_scales[None, :]
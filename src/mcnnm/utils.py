@@ -7,7 +7,16 @@ import pandas as pd
 
 from .types import Array, Scalar
 
-jax.config.update("jax_enable_x64", True)
+
+def enable_x64() -> None:
+    """
+    Enable 64-bit (double) precision in JAX.
+
+    The estimators run in the precision of the arrays passed to them, which is 32-bit under JAX's
+    default configuration. Call this once at the top of a script, before any arrays are created,
+    to switch JAX to 64-bit floats globally for higher accuracy at the cost of speed and memory.
+    """
+    jax.config.update("jax_enable_x64", True)
 
 
 def convert_inputs(
@@ -214,11 +223,11 @@ def generate_data(
     Y = (
         L
         + Y_mean
-        + np.outer(unit_fe_values, np.ones(nperiods))
-        + np.outer(np.ones(nobs), time_fe_values)
-        + (np.repeat(X @ X_coef, nperiods).reshape(nobs, nperiods) if X_cov else 0)  # type: ignore
-        + (np.tile((Z @ Z_coef).reshape(1, -1), (nobs, 1)) if Z_cov else 0)  # type: ignore
-        + (np.sum(V * V_coef, axis=2) if V_cov and V is not None else 0)  # type: ignore[operator]
+        + unit_fe_values[:, None]
+        + time_fe_values[None, :]
+        + ((X @ X_coef)[:, None] if X_cov else 0)  # type: ignore
+        + ((Z @ Z_coef)[None, :] if Z_cov else 0)  # type: ignore
+        + (V @ V_coef if V_cov and V is not None else 0)  # type: ignore[operator]
         + errors
     )
 
@@ -254,12 +263,12 @@ def generate_data(
     Y_0 = Y.copy()  # untreated potential outcome
     Y += treat * treatment_effect
 
-    # Convert Y, W, and covariates to JAX arrays
-    Y = jnp.array(Y)
-    W = jnp.array(treat, dtype=jnp.float64)
-    X = jnp.array(X) if X is not None else None
-    Z = jnp.array(Z) if Z is not None else None
-    V = jnp.array(V) if V is not None else None  # type: ignore[assignment]
+    # Convert Y, W, and covariates to JAX arrays; asarray leaves arrays that already are JAX arrays uncopied
+    Y = jnp.asarray(Y)
+    W = jnp.asarray(treat, dtype=Y.dtype)
+    X = jnp.asarray(X) if X is not None else None
+    Z = jnp.asarray(Z) if Z is not None else None
+    V = jnp.asarray(V) if V is not None else None  # type: ignore[assignment]
 
     true_params = {
         "L": L,
@@ -338,10 +347,31 @@ def generate_lambda_grid(lambda_L_values: Array, lambda_H_values: Array) -> jnp.
         jnp.ndarray: A 2D array where each row represents a pair of lambda values (lambda_L, lambda_H).
 
     """
-    lambda_grid = jnp.array(jnp.meshgrid(lambda_L_values, lambda_H_values, indexing="ij")).reshape(2, -1).T
+    lambda_grid = jnp.stack(jnp.meshgrid(lambda_L_values, lambda_H_values, indexing="ij")).reshape(2, -1).T
     return lambda_grid
 
 
+def lambda_grid_scan_order(n_lambda_L: int, n_lambda_H: int) -> jnp.ndarray:
+    """
+    Returns a serpentine visiting order for a lambda grid created by :func:`generate_lambda_grid`.
+
+    The validation routines fit the grid points in sequence, warm-starting each fit from the previous
+    solution. In the row-major order of the grid, lambda_H jumps from its smallest back to its largest
+    value every time lambda_L decreases. Reversing every other row keeps consecutive grid points adjacent,
+    so each fit starts close to its solution.
+
+    Args:
+        n_lambda_L (int): The number of lambda_L values in the grid.
+        n_lambda_H (int): The number of lambda_H values in the grid.
+
+    Returns:
+        jnp.ndarray: A permutation of the grid indices, to be applied as ``lambda_grid[order]``.
+    """
+    order = jnp.arange(n_lambda_L * n_lambda_H).reshape(n_lambda_L, n_lambda_H)
+    order = order.at[1::2].set(order[1::2, ::-1])
+    return order.ravel()
+
+
 def extract_shortest_path(lambda_grid):
     """
     Extracts the shortest path along the edges of a 2D lambda grid.
@@ -1,5 +1,6 @@
 import jax
 import jax.numpy as jnp
+import numpy as np
 
 from .core import (
     compute_objective_value,
@@ -7,8 +8,9 @@ from .core import (
     initialize_fixed_effects_and_H,
     initialize_matrices,
 )
+from .core_utils import nuclear_norm
 from .types import Array, Scalar
-from .utils import extract_shortest_path, generate_lambda_grid, propose_lambda_values
+from .utils import extract_shortest_path, generate_lambda_grid, lambda_grid_scan_order, propose_lambda_values
 
 
 def cross_validate(
@@ -117,7 +119,7 @@ def cross_validate(
     L, X_tilde, Z_tilde, V = initialize_matrices(Y, X, Z, V)
 
     def initialize_fold(fold_mask):
-        Y_train = Y * fold_mask
+        # Only the entries selected by W_train enter the fit, so Y can be passed unmasked
         W_train = W * fold_mask
 
         (
@@ -131,7 +133,7 @@ def cross_validate(
             lambda_L_max,
             lambda_H_max,
         ) = initialize_fixed_effects_and_H(
-            Y_train,
+            Y,
             L,
             X_tilde,
             Z_tilde,
@@ -163,6 +165,8 @@ def cross_validate(
     lambda_H_values = propose_lambda_values(max_lambda=max_lambda_H, n_lambdas=num_lam)
 
     lambda_grid = generate_lambda_grid(lambda_L_values, lambda_H_values)
+    # Visit the grid in serpentine order so every warm start comes from a neighbouring grid point
+    scan_order = lambda_grid_scan_order(lambda_L_values.shape[0], lambda_H_values.shape[0])
 
     def fold_loss(
         gamma_init,
@@ -176,17 +180,16 @@ def cross_validate(
         lambda_H_max,
         holdout_mask,
     ):
-        Y_train = Y * holdout_mask
+        # The core routines only read Y through the observation masks, so the training and validation
+        # entries are selected by W_train and W_val alone and no masked copies of Y are needed
         W_train = W * holdout_mask
-
-        Y_val = Y * (1 - holdout_mask)
         W_val = W * (1 - holdout_mask)
 
         def compute_rmse(carry, lambda_L_H):
             lambda_L, lambda_H = lambda_L_H
             L, H_tilde_init, in_prod_init, gamma_init, delta_init, beta_init = carry
             H_new, L_new, gamma_new, delta_new, beta_new, in_prod_new, loss = fit(
-                Y=Y_train,
+                Y=Y,
                 X_tilde=X_tilde,
                 Z_tilde=Z_tilde,
                 V=V,
@@ -209,11 +212,10 @@ def cross_validate(
             )
 
             # get sum of singular values of L_new
-            _, singular_values, _ = jnp.linalg.svd(L, full_matrices=False)
-            sum_sigma = jnp.sum(singular_values)
+            sum_sigma = nuclear_norm(L)
 
             rmse = compute_objective_value(
-                Y=Y_val,
+                Y=Y,
                 X_tilde=X_tilde,
                 Z_tilde=Z_tilde,
                 V=V,
@@ -242,8 +244,9 @@ def cross_validate(
             return new_carry, fold_val_rmse
 
         init_state = (L, H_tilde_init, in_prod_init, gamma_init, delta_init, beta_init)
-        _, fold_val_rmses = jax.lax.scan(compute_rmse, init_state, lambda_grid)
-        return fold_val_rmses
+        _, scanned_rmses = jax.lax.scan(compute_rmse, init_state, lambda_grid[scan_order])
+        # Return the RMSEs in grid order
+        return jnp.zeros_like(scanned_rmses).at[scan_order].set(scanned_rmses)
 
     # Unpack fold_configs explicitly to satisfy type checker
     (
@@ -388,7 +391,8 @@ def holdout_validate(
 
     def create_holdout_masks(W, initial_window, step_size, horizon, K, max_window_size):
         N, T = W.shape
-        masks = []
+        # The training windows depend only on the integer configuration, so their bounds are computed in Python
+        windows = []
         start_index = initial_window
         for _ in range(K):
             end_index = min(start_index + horizon, T)
@@ -397,23 +401,25 @@ def holdout_validate(
             else:
                 train_start = 0
 
-            mask = jnp.zeros((N, T), dtype=bool)
-            mask = mask.at[:, train_start:start_index].set(True)  # Training period
-
-            n_train = jnp.sum(W * mask)
-            if n_train > 0:
-                masks.append(mask)
+            windows.append((train_start, start_index))  # Training period
 
             start_index += step_size
             if end_index >= T:
                 break
 
-        if not masks:  # pragma: no cover
+        # Build all time masks in one broadcast comparison and count the observed training entries per fold
+        # from the per-period counts of W, so that only a single device-to-host transfer is needed
+        bounds = jnp.array(windows)
+        periods = jnp.arange(T)
+        time_masks = (periods >= bounds[:, :1]) & (periods < bounds[:, 1:])
+        n_train = jnp.sum(jnp.where(time_masks, jnp.sum(W, axis=0), 0), axis=1)
+        time_masks = time_masks[np.asarray(n_train > 0)]
+
+        if time_masks.shape[0] == 0:  # pragma: no cover
             # If no valid masks were created, create a single mask using all available data
-            mask = jnp.ones((N, T), dtype=bool)  # pragma: no cover
-            masks.append(mask)  # pragma: no cover
+            return jnp.ones((1, N, T), dtype=bool)  # pragma: no cover
 
-        return jnp.array(masks)
+        return jnp.broadcast_to(time_masks[:, None, :], (time_masks.shape[0], N, T))
 
     holdout_masks = create_holdout_masks(W, initial_window, step_size, horizon, K, max_window_size)
     if holdout_masks.shape[0] < K:
@@ -429,7 +435,7 @@ def holdout_validate(
     L, X_tilde, Z_tilde, V = initialize_matrices(Y, X, Z, V)
 
     def initialize_holdout(holdout_mask):
-        Y_train = Y * holdout_mask
+        # Only the entries selected by W_train enter the fit, so Y can be passed unmasked
         W_train = W * holdout_mask
 
         (
@@ -443,7 +449,7 @@ def holdout_validate(
             lambda_L_max,
             lambda_H_max,
         ) = initialize_fixed_effects_and_H(
-            Y_train,
+            Y,
             L,
             X_tilde,
             Z_tilde,
@@ -475,6 +481,8 @@ def holdout_validate(
     lambda_H_values = propose_lambda_values(max_lambda=max_lambda_H, n_lambdas=num_lam)
 
     lambda_grid = generate_lambda_grid(lambda_L_values, lambda_H_values)
+    # Visit the grid in serpentine order so every warm start comes from a neighbouring grid point
+    scan_order = lambda_grid_scan_order(lambda_L_values.shape[0], lambda_H_values.shape[0])
 
     def holdout_fold_loss(
         gamma_init,
@@ -488,17 +496,16 @@ def holdout_validate(
         lambda_H_max,
         holdout_mask,
     ):
-        Y_train = Y * holdout_mask
+        # The core routines only read Y through the observation masks, so the training and validation
+        # entries are selected by W_train and W_val alone and no masked copies of Y are needed
         W_train = W * holdout_mask
-
-        Y_val = Y * (1 - holdout_mask)
         W_val = W * (1 - holdout_mask)
 
         def compute_holdout_rmse(carry, lambda_L_H):
             lambda_L, lambda_H = lambda_L_H
             L, H_tilde_init, in_prod_init, gamma_init, delta_init, beta_init = carry
             H_new, L_new, gamma_new, delta_new, beta_new, in_prod_new, loss = fit(
-                Y=Y_train,
+                Y=Y,
                 X_tilde=X_tilde,
                 Z_tilde=Z_tilde,
                 V=V,
@@ -521,11 +528,10 @@ def holdout_validate(
             )
 
             # get sum of singular values of L_new
-            _, singular_values, _ = jnp.linalg.svd(L, full_matrices=False)
-            sum_sigma = jnp.sum(singular_values)
+            sum_sigma = nuclear_norm(L)
 
             rmse = compute_objective_value(
-                Y=Y_val,
+                Y=Y,
                 X_tilde=X_tilde,
                 Z_tilde=Z_tilde,
                 V=V,
@@ -554,8 +560,9 @@ def holdout_validate(
             return new_carry, fold_val_rmse
 
         init_state = (L, H_tilde_init, in_prod_init, gamma_init, delta_init, beta_init)
-        _, fold_val_rmses = jax.lax.scan(compute_holdout_rmse, init_state, lambda_grid)
-        return fold_val_rmses
+        _, scanned_rmses = jax.lax.scan(compute_holdout_rmse, init_state, lambda_grid[scan_order])
+        # Return the RMSEs in grid order
+        return jnp.zeros_like(scanned_rmses).at[scan_order].set(scanned_rmses)
 
     # Unpack holdout_configs explicitly to satisfy type checker
     (
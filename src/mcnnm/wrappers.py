@@ -1,14 +1,52 @@
+from functools import partial
 from typing import Literal, NamedTuple, cast
 
 import jax.numpy as jnp
+from jax import jit
 
-from .core import compute_Y_hat, initialize_fixed_effects_and_H, initialize_matrices
+from .core import compute_Y_hat, initialize_matrices
 from .core_utils import is_positive_definite
 from .types import Array, Scalar
 from .utils import validate_holdout_config
 from .validation import cross_validate, final_fit, holdout_validate
 
 
+@partial(jit, static_argnames=("use_unit_fe", "use_time_fe"))
+def _complete_outcomes(
+    Y: Array,
+    W: Array,
+    L: Array,
+    X_tilde: Array,
+    Z_tilde: Array,
+    V: Array,
+    H_tilde: Array,
+    gamma: Array,
+    delta: Array,
+    beta: Array,
+    use_unit_fe: bool,
+    use_time_fe: bool,
+) -> tuple[Array, Array]:
+    """
+    Compute the completed outcome matrix and the average treatment effect in one compiled program.
+    W is the observation mask (1 for untreated entries), as in :func:`estimate`. X_tilde and Z_tilde
+    must be the augmented matrices [X, I_N] and [Z, I_T] returned by :func:`.core.initialize_matrices`.
+    """
+    N, T = L.shape
+    P = X_tilde.shape[1] - N
+    Q = Z_tilde.shape[1] - T
+
+    # The identity blocks of X_tilde and Z_tilde only select blocks of H_tilde, so the covariate term is
+    # assembled from the raw covariates instead of multiplying through the (N, N) and (T, T) identities.
+    # compute_Y_hat covers every block except the unit-time block H_tilde[P:, Q:], which is added as is.
+    Y_completed = compute_Y_hat(
+        L, X_tilde[:, :P], Z_tilde[:, :Q], V, H_tilde, gamma, delta, beta, use_unit_fe, use_time_fe
+    )
+    Y_completed = Y_completed + H_tilde[P:, Q:]
+    treated = 1 - W
+    tau = jnp.sum((Y - Y_completed) * treated) / jnp.sum(treated)
+    return Y_completed, tau
+
+
 def compute_treatment_effect(
     Y: Array,
     W: Array,
@@ -49,9 +87,8 @@ def compute_treatment_effect(
         Scalar: The estimated average treatment effect.
     """
     Y_completed = compute_Y_hat(L, X_tilde, Z_tilde, V, H_tilde, gamma, delta, beta, use_unit_fe, use_time_fe)
-    W = 1 - W
-    treated_units = jnp.sum(W)
-    tau = jnp.sum((Y - Y_completed) * W) / treated_units
+    treated = 1 - W
+    tau = jnp.sum((Y - Y_completed) * treated) / jnp.sum(treated)
     tau = cast("Scalar", tau.item())  # type: ignore
     return tau
 
@@ -122,10 +159,9 @@ def estimate(
 
     1. Input Validation and Initialization:
        - Checks the dimensions of input matrices Y and W.
-       - Initializes the inverse of the Omega matrix (Omega_inv) if provided, otherwise uses an identity matrix.
+       - Initializes the inverse of the Omega matrix (Omega_inv) if provided, otherwise uses identity weighting.
        - Validates that Omega_inv is positive definite.
-       - Initializes matrices L, X_tilde, Z_tilde, and V using the initialize_matrices function.
-       - Initializes fixed effects and H matrix using the initialize_fixed_effects_and_H function.
+       - Builds the augmented covariate matrices X_tilde, Z_tilde and V using the initialize_matrices function.
 
     2. Lambda Selection:
        - If lambda_L or lambda_H are not provided, performs validation to select optimal values:
@@ -146,8 +182,8 @@ def estimate(
        - Uses a warm-start approach, fitting the model along a path of lambda values.
 
     4. Results Computation:
-       - Computes the completed outcome matrix using the compute_Y_hat function.
-       - Calculates the average treatment effect using the compute_treatment_effect function.
+       - Computes the completed outcome matrix and the average treatment effect together in one compiled
+         program, which evaluates compute_Y_hat once and averages the differences over the treated entries.
 
     5. Return Results:
        - Returns an MCNNMResults object containing the estimated parameters, completed matrix, and treatment effect.
@@ -241,7 +277,7 @@ def estimate(
         - :func:`validation.holdout_validate`: Function used for holdout validation.
         - :func:`validation.final_fit`: Function used for the final model fitting.
         - :func:`.core.compute_Y_hat`: Function used to compute the completed outcome matrix.
-        - :func:`.core.compute_treatment_effect`: Function used to compute the average treatment effect.
+        - :func:`compute_treatment_effect`: Function that computes the average treatment effect from fitted estimates.
     """
     W = 1 - Mask  # get inverse mask where 1 indicates no treatment
 
@@ -272,28 +308,18 @@ def estimate(
     N, T = Y.shape
 
     if Omega is None:
-        Omega_inv = jnp.eye(T)  # default TxT identity matrix
+        # Without Omega the weighting is the identity. Leaving Omega_inv unset lets the objective use the fused
+        # masked squared-error reduction instead of a dense (T, T) product and positive definiteness check
+        Omega_inv = None
     else:
         Omega_inv = jnp.linalg.inv(Omega)  # invert Omega if specified
 
-    if not is_positive_definite(Omega_inv):  # pragma: no cover
+    if Omega_inv is not None and not is_positive_definite(Omega_inv):  # pragma: no cover
         raise ValueError("Omega_inv must be a positive definite matrix.")
 
-    # Initialize matrices to zero of correct dimensions
-    L, X_tilde, Z_tilde, V = initialize_matrices(Y, X, Z, V)
-
-    # Initialize fixed effects and H matrix
-    (
-        gamma_init,
-        delta_init,
-        beta_init,
-        H_tilde_init,
-        T_mat_init,
-        in_prod_T_init,
-        in_prod_init,
-        lambda_L_max,
-        lambda_H_max,
-    ) = initialize_fixed_effects_and_H(Y, L, X_tilde, Z_tilde, V, W, use_unit_fe, use_time_fe, verbose=False)
+    # Build the augmented covariate matrices used to assemble the completed outcome matrix. The fixed effects
+    # and H are initialized inside the validation and final fit routines, so no initialization is needed here
+    _, X_tilde, Z_tilde, V = initialize_matrices(Y, X, Z, V)
 
     # Select lambda values via validation
     if lambda_L is None or lambda_H is None:
@@ -347,8 +373,9 @@ def estimate(
         else:
             raise ValueError("Invalid validation method. Must be 'cv' or 'holdout'.")  # pragma: no cover
     else:
-        opt_lambda_L = jnp.array(lambda_L)
-        opt_lambda_H = jnp.array(lambda_H)
+        # Already converted to arrays above; asarray avoids a second copy
+        opt_lambda_L = jnp.asarray(lambda_L)
+        opt_lambda_H = jnp.asarray(lambda_H)
         lambda_L_opt_range, lambda_H_opt_range = opt_lambda_L, opt_lambda_H
 
     # Fit the final model
@@ -367,12 +394,14 @@ def estimate(
         lambda_H_opt_range=lambda_H_opt_range,
     )
 
-    # Compute the completed outcome matrix
-    Y_completed = compute_Y_hat(
+    # Compute the completed outcome matrix and the average treatment effect, sharing a single Y hat
+    Y_completed, tau = _complete_outcomes(
+        Y,
+        W,
         L_final,
         X_tilde,
         Z_tilde,
-        V,
+        V,  # type: ignore[arg-type]
         H_final,
         gamma_final,
         delta_final,
@@ -380,22 +409,7 @@ def estimate(
         use_unit_fe,
         use_time_fe,
     )
-
-    # Compute the average treatment effect
-    tau = compute_treatment_effect(
-        Y=Y,
-        W=W,
-        L=L_final,
-        X_tilde=X_tilde,
-        Z_tilde=Z_tilde,
-        V=V,  # type: ignore[arg-type]
-        H_tilde=H_final,
-        gamma=gamma_final,
-        delta=delta_final,
-        beta=beta_final,
-        use_unit_fe=use_unit_fe,
-        use_time_fe=use_time_fe,
-    )
+    tau = cast("Scalar", tau.item())  # type: ignore
 
     return MCNNMResults(
         tau=tau,
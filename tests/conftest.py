@@ -0,0 +1,4 @@
+from mcnnm import enable_x64
+
+# The test suite checks results at double-precision tolerances.
+enable_x64()
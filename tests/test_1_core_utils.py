@@ -1,5 +1,6 @@
 import jax
 import jax.numpy as jnp
+import numpy as np
 import pytest
 from jax import random
 
@@ -9,9 +10,11 @@ from mcnnm.core_utils import (
     is_positive_definite,
     mask_observed,
     mask_unobserved,
+    masked_frobenius_norm_sq,
     normalize,
     normalize_back,
     nuclear_norm,
+    spectral_norm,
 )
 
 key = jax.random.PRNGKey(2024)
@@ -89,6 +92,25 @@ def test_mask_observed_shape_mismatch():
         mask_observed(A, mask)
 
 
+def test_mask_observed_batched(sample_data):
+    Y, W, _, _, _ = sample_data
+    masks = jnp.stack([W, 1 - W, jnp.ones_like(W)])
+    batched = mask_observed(Y, masks)
+    assert batched.shape == masks.shape
+    for k in range(masks.shape[0]):
+        assert jnp.allclose(batched[k], mask_observed(Y, masks[k]))
+
+
+def test_mask_batch_dimension_mismatch(sample_data):
+    Y, W, _, _, _ = sample_data
+    A = jnp.stack([Y] * 3)
+    masks = jnp.stack([W] * 4)
+    with pytest.raises(ValueError):
+        mask_observed(A, masks)
+    with pytest.raises(ValueError):
+        mask_unobserved(A, masks)
+
+
 def test_mask_unobserved(sample_data):
     Y, W, _, _, _ = sample_data
     mask = jnp.where(W == 0, True, False)
@@ -113,17 +135,58 @@ def test_frobenius_norm_non_2d():
         frobenius_norm(A)
 
 
+def test_norms_numpy_input():
+    A = np.array([[1.0, -2.0], [3.0, -4.0]])
+    assert isinstance(frobenius_norm(A), np.floating)
+    assert np.isclose(frobenius_norm(A), np.sqrt(30))
+    assert np.isclose(element_wise_l1_norm(A), 10)
+    mask = np.array([[1, 0], [0, 1]])
+    assert isinstance(mask_observed(A, mask), np.ndarray)
+    assert np.allclose(mask_observed(A, mask) + mask_unobserved(A, mask), A)
+
+
 def test_nuclear_norm():
     A = jnp.array([[1, 2], [3, 4]])
     assert jnp.allclose(nuclear_norm(A), jnp.sum(jnp.linalg.svd(A, compute_uv=False)))
 
 
+def test_nuclear_norm_tall_and_wide():
+    A = random.normal(key, (20, 4))
+    expected = jnp.sum(jnp.linalg.svd(A, compute_uv=False))
+    assert jnp.allclose(nuclear_norm(A), expected)
+    assert jnp.allclose(nuclear_norm(A.T), expected)
+
+
+def test_nuclear_norm_low_rank_float32():
+    rng = np.random.default_rng(0)
+    for (m, n), rank in [((50, 200), 3), ((100, 300), 2), ((30, 1000), 1)]:
+        A = rng.standard_normal((m, rank)) @ rng.standard_normal((rank, n))
+        expected = np.sum(np.linalg.svd(A, compute_uv=False))
+        with jax.enable_x64(False):
+            result = nuclear_norm(jnp.asarray(A, dtype=jnp.float32))
+        assert result.dtype == jnp.float32
+        assert np.isclose(result, expected, rtol=1e-5)
+
+
 def test_nuclear_norm_non_2d():
     A = jnp.array([1, 2, 3])
     with pytest.raises(ValueError, match="Input must be a 2D array."):
         nuclear_norm(A)
 
 
+def test_spectral_norm_tall_wide_and_square():
+    for shape in [(20, 4), (4, 20), (6, 5)]:
+        A = random.normal(key, shape)
+        expected = jnp.max(jnp.linalg.svd(A, compute_uv=False))
+        assert jnp.allclose(spectral_norm(A), expected)
+
+
+def test_spectral_norm_non_2d():
+    A = jnp.array([1, 2, 3])
+    with pytest.raises(ValueError, match="Input must be a 2D array."):
+        spectral_norm(A)
+
+
 def test_element_wise_l1_norm():
     A = jnp.array([[1, -2], [-3, 4]])
     assert jnp.allclose(element_wise_l1_norm(A), 10)
@@ -135,6 +198,19 @@ def test_element_wise_l1_norm_non_2d():
         element_wise_l1_norm(A)
 
 
+def test_masked_frobenius_norm_sq(sample_data):
+    Y, W, _, _, _ = sample_data
+    mask = jnp.where(W == 0, True, False)
+    assert jnp.allclose(masked_frobenius_norm_sq(Y, mask), frobenius_norm(mask_observed(Y, mask)) ** 2)
+
+
+def test_masked_frobenius_norm_sq_shape_mismatch():
+    A = jnp.array([[1, 2], [3, 4]])
+    mask = jnp.array([[True, False]])
+    with pytest.raises(ValueError):
+        masked_frobenius_norm_sq(A, mask)
+
+
 def test_normalize_happy_path():
     mat = jnp.array([[1, 2], [3, 4]])
     mat_norm, col_norms = normalize(mat)
@@ -158,6 +234,21 @@ def test_normalize_empty_matrix():
     assert col_norms.shape == (0,)
 
 
+def test_normalize_zero_width_matrix():
+    mat = jnp.zeros((3, 0))
+    mat_norm, col_norms = normalize(mat)
+    assert mat_norm.shape == (3, 0)
+    assert col_norms.shape == (0,)
+
+
+def test_normalize_zero_row_matrix():
+    mat = jnp.zeros((0, 3))
+    mat_norm, col_norms = normalize(mat)
+    assert mat_norm.shape == (0, 3)
+    assert jnp.all(col_norms == 0)
+    assert col_norms.shape == (3,)
+
+
 def test_normalize_zero_column():
     mat = jnp.array([[0, 0], [0, 0]])
     mat_norm, col_norms = normalize(mat)
@@ -166,6 +257,14 @@ def test_normalize_zero_column():
     assert jnp.all(mat_norm == 0)
 
 
+def test_normalize_nonzero_column_norms_exact():
+    mat = jnp.array([[3.0, 0.0], [4.0, 0.0]])
+    mat_norm, col_norms = normalize(mat)
+    assert col_norms[0] == 5.0
+    assert jnp.allclose(mat_norm[:, 0], jnp.array([0.6, 0.8]))
+    assert jnp.all(mat_norm[:, 1] == 0)
+
+
 def test_normalize_back_happy_path():
     H = jnp.array([[1, 2], [3, 4]])
     row_scales = jnp.array([1, 2])
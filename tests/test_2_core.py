@@ -595,6 +595,31 @@ def test_update_beta_zero_V():
     assert jnp.allclose(output, jnp.zeros_like(output))
 
 
+def test_updates_with_precomputed_covariate_contribution():
+    Y = jnp.array([[1, 2], [3, 4]])
+    X_tilde = jnp.array([[1, 1, 1, 0], [1, 1, 0, 1]])
+    Z_tilde = jnp.array([[1, 1, 1, 0], [1, 1, 0, 1]])
+    V = jnp.array([[[1, 2], [3, 4]], [[5, 6], [7, 8]]])
+    H_tilde = jnp.array([[1, 1, 1, 1], [1, 1, 1, 1], [1, 1, 1, 1], [1, 1, 1, 1]])
+    W = jnp.array([[1, 0], [1, 1]])
+    L = jnp.array([[1, 1], [1, 1]])
+    unit_fe = jnp.array([1, 1])
+    time_fe = jnp.array([1, 1])
+    cov = X_tilde @ H_tilde @ Z_tilde.T
+    assert jnp.allclose(
+        update_unit_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, time_fe, True, cov),
+        update_unit_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, time_fe, True),
+    )
+    assert jnp.allclose(
+        update_time_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, unit_fe, True, cov),
+        update_time_fe(Y, X_tilde, Z_tilde, H_tilde, W, L, unit_fe, True),
+    )
+    assert jnp.allclose(
+        update_beta(Y, X_tilde, Z_tilde, V, H_tilde, W, L, unit_fe, time_fe, cov),
+        update_beta(Y, X_tilde, Z_tilde, V, H_tilde, W, L, unit_fe, time_fe),
+    )
+
+
 def test_initialize_matrices_happy_path():
     Y = jnp.array([[1, 2], [3, 4]])
     X = jnp.array([[1, 1], [1, 1]])
@@ -1036,6 +1061,32 @@ def test_update_H_without_fixed_effects():
     assert not jnp.allclose(H_tilde_updated, jnp.zeros_like(H_tilde_updated))
 
 
+def test_update_H_with_precomputed_num_train():
+    key = random.PRNGKey(0)
+    N, T, P, Q, J = 5, 4, 3, 2, 2
+    Y = random.normal(key, (N, T))
+    X_tilde = random.normal(key, (N, P + N))
+    Z_tilde = random.normal(key, (T, Q + T))
+    V = random.normal(key, (N, T, J))
+    H_tilde = random.normal(key, (P + N, Q + T))
+    T_mat = random.normal(key, (N * T, (P + N) * (Q + T)))
+    in_prod = random.normal(key, (N * T,))
+    in_prod_T = random.normal(key, ((P + N) * (Q + T),))
+    W = random.bernoulli(key, 0.8, (N, T))
+    L = random.normal(key, (N, T))
+    unit_fe = random.normal(key, (N,))
+    time_fe = random.normal(key, (T,))
+    beta = random.normal(key, (J,))
+    lambda_H = 0.1
+
+    args = (Y, X_tilde, Z_tilde, V, H_tilde, T_mat, in_prod, in_prod_T, W, L, unit_fe, time_fe, beta, lambda_H)
+    H_upd, in_prod_upd = update_H(*args, True, True)
+    H_pre, in_prod_pre = update_H(*args, True, True, jnp.sum(W))
+
+    assert jnp.allclose(H_pre, H_upd)
+    assert jnp.allclose(in_prod_pre, in_prod_upd)
+
+
 def test_update_L_no_regularization():
     # Test case with no regularization (lambda_L = 0)
     key = random.PRNGKey(0)
@@ -1114,6 +1165,30 @@ def test_update_L_without_fixed_effects():
     assert not jnp.allclose(L_upd, jnp.zeros_like(L))
 
 
+def test_update_L_with_precomputed_num_train():
+    key = random.PRNGKey(0)
+    N, T, P, Q, J = 5, 4, 3, 2, 2
+    Y = random.normal(key, (N, T))
+    X_tilde = random.normal(key, (N, P + N))
+    Z_tilde = random.normal(key, (T, Q + T))
+    V = random.normal(key, (N, T, J))
+    H_tilde = random.normal(key, (P + N, Q + T))
+    W = random.bernoulli(key, 0.8, (N, T))
+    L = random.normal(key, (N, T))
+    unit_fe = random.normal(key, (N,))
+    time_fe = random.normal(key, (T,))
+    beta = random.normal(key, (J,))
+    lambda_L = 0.1
+
+    L_upd, S = update_L(Y, X_tilde, Z_tilde, V, H_tilde, W, L, unit_fe, time_fe, beta, lambda_L, True, True)
+    L_pre, S_pre = update_L(
+        Y, X_tilde, Z_tilde, V, H_tilde, W, L, unit_fe, time_fe, beta, lambda_L, True, True, jnp.sum(W)
+    )
+
+    assert jnp.allclose(L_pre, L_upd)
+    assert jnp.allclose(S_pre, S)
+
+
 def test_fit_happy_path():
     N, T = 24, 48
     Y, W, X, Z, V, true_params = generate_data(N, T, seed=2024)
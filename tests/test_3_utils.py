@@ -15,6 +15,7 @@ from mcnnm.utils import (
     extract_shortest_path,
     generate_data,
     generate_lambda_grid,
+    lambda_grid_scan_order,
     propose_lambda_values,
     validate_holdout_config,
 )
@@ -612,6 +613,21 @@ def test_generate_lambda_grid_different_values():
     assert jnp.allclose(lambda_grid[-1], jnp.array([0.0, 0.0]))
 
 
+def test_lambda_grid_scan_order():
+    lambda_L_values = jnp.array([10.0, 5.0, 1.0])
+    lambda_H_values = jnp.array([20.0, 10.0, 5.0, 0.0])
+
+    lambda_grid = generate_lambda_grid(lambda_L_values, lambda_H_values)
+    order = lambda_grid_scan_order(3, 4)
+
+    assert jnp.array_equal(jnp.sort(order), jnp.arange(12))
+    path = lambda_grid[order]
+    assert jnp.allclose(path[0], jnp.array([10.0, 20.0]))
+    assert jnp.allclose(path[4], jnp.array([5.0, 0.0]))  # second row is traversed in reverse
+    # Consecutive grid points differ in exactly one of the two lambdas
+    assert jnp.all(jnp.sum(path[1:] != path[:-1], axis=1) == 1)
+
+
 def test_extract_shortest_path():
     lambda_L_values = jnp.array([10.0, 5.0, 1.0, 0.0])
     lambda_H_values = jnp.array([10.0, 5.0, 1.0, 0.0])
@@ -4,10 +4,11 @@ import jax
 import jax.numpy as jnp
 import pytest
 
-from mcnnm import complete_matrix
-from mcnnm.core import initialize_fixed_effects_and_H, initialize_matrices
+from mcnnm import complete_matrix, wrappers
+from mcnnm.core import compute_Y_hat, initialize_fixed_effects_and_H, initialize_matrices
 from mcnnm.types import Array
 from mcnnm.utils import generate_data
+from mcnnm.validation import final_fit
 from mcnnm.wrappers import compute_treatment_effect, estimate
 
 key = jax.random.PRNGKey(2024)
@@ -51,6 +52,54 @@ def test_compute_treatment_effect(N, T, fe_params, X_cov, Z_cov, V_cov, noise_sc
     # No point in checking the exact value of the treatment effect, as it is computed off the initialization.
 
 
+@pytest.mark.parametrize("fe_params", [(False, False), (True, False), (False, True), (True, True)])
+@pytest.mark.parametrize("X_cov", [False, True])
+@pytest.mark.parametrize("Z_cov", [False, True])
+@pytest.mark.parametrize("V_cov", [False, True])
+def test_complete_outcomes_matches_full_covariate_product(fe_params, X_cov, Z_cov, V_cov):
+    use_unit_fe, use_time_fe = fe_params
+    N, T = 8, 10
+    Y, W, X, Z, V, _ = generate_data(nobs=N, nperiods=T, X_cov=X_cov, Z_cov=Z_cov, V_cov=V_cov, seed=2024)
+    L, X_tilde, Z_tilde, V = initialize_matrices(Y, X if X_cov else None, Z if Z_cov else None, V if V_cov else None)
+    keys = jax.random.split(key, 5)
+    L = jax.random.normal(keys[0], (N, T))
+    H_tilde = jax.random.normal(keys[1], (X_tilde.shape[1], Z_tilde.shape[1]))
+    gamma = jax.random.normal(keys[2], (N,))
+    delta = jax.random.normal(keys[3], (T,))
+    beta = jax.random.normal(keys[4], (V.shape[2],))
+
+    # The block-sliced assembly must agree with the product over the full augmented matrices
+    expected_Y = compute_Y_hat(L, X_tilde, Z_tilde, V, H_tilde, gamma, delta, beta, use_unit_fe, use_time_fe)
+    expected_tau = jnp.sum((Y - expected_Y) * (1 - W)) / jnp.sum(1 - W)
+
+    Y_completed, tau = wrappers._complete_outcomes(
+        Y, W, L, X_tilde, Z_tilde, V, H_tilde, gamma, delta, beta, use_unit_fe, use_time_fe
+    )
+    assert jnp.allclose(Y_completed, expected_Y)
+    assert jnp.allclose(tau, expected_tau)
+
+
+def test_compute_treatment_effect_non_augmented_covariates():
+    N, T, P, Q, J = 8, 10, 3, 2, 2
+    keys = jax.random.split(key, 9)
+    Y = jax.random.normal(keys[0], (N, T))
+    W = jax.random.bernoulli(keys[1], 0.7, (N, T)).astype(Y.dtype)
+    L = jax.random.normal(keys[2], (N, T))
+    X = jax.random.normal(keys[3], (N, P))
+    Z = jax.random.normal(keys[4], (T, Q))
+    V = jax.random.normal(keys[5], (N, T, J))
+    H = jax.random.normal(keys[6], (P, Q))
+    gamma = jax.random.normal(keys[7], (N,))
+    delta = jax.random.normal(keys[8], (T,))
+    beta = jnp.ones(J)
+
+    Y_hat = compute_Y_hat(L, X, Z, V, H, gamma, delta, beta, True, True)
+    expected = jnp.sum((Y - Y_hat) * (1 - W)) / jnp.sum(1 - W)
+
+    tau = compute_treatment_effect(Y, W, L, X, Z, V, H, gamma, delta, beta, True, True)
+    assert jnp.allclose(tau, expected)
+
+
 @pytest.mark.parametrize("N, T", [(12, 30)])
 @pytest.mark.parametrize("fe_params", [(True, False), (False, True), (True, True)])
 @pytest.mark.parametrize("X_cov", [False, True])
@@ -275,3 +324,82 @@ def test_complete_matrix():
     assert not jnp.isnan(opt_lambda_H), "lambda_H contains NaN values"
     assert not jnp.isinf(opt_lambda_H), "lambda_H contains infinite values"
     assert opt_lambda_H >= 0, "lambda_H is negative"
+
+
+def test_estimate_symmetric_omega(monkeypatch):
+    N, T = 10, 20
+    Y, W, X, Z, V, true_params = generate_data(
+        nobs=N,
+        nperiods=T,
+        unit_fe=True,
+        time_fe=True,
+        seed=2024,
+        noise_scale=1.0,
+        autocorrelation=0.5,
+        assignment_mechanism="block",
+        treated_fraction=0.5,
+    )
+    lags = jnp.abs(jnp.arange(T)[:, None] - jnp.arange(T)[None, :])
+    Omega = 0.5**lags  # symmetric AR(1) covariance matrix
+
+    # Record the inverse that estimate passes on to the final fit
+    captured = {}
+
+    def recording_final_fit(**kwargs):
+        captured["Omega_inv"] = kwargs["Omega_inv"]
+        return final_fit(**kwargs)
+
+    monkeypatch.setattr(wrappers, "final_fit", recording_final_fit)
+
+    results = estimate(Y=Y, Mask=W, Omega=Omega, lambda_L=0.01, lambda_H=0.01, max_iter=100, tol=1e-3)
+
+    # estimate must pass the inverse of Omega on to the final fit
+    assert jnp.allclose(captured["Omega_inv"], jnp.linalg.inv(Omega), rtol=1e-8, atol=1e-10)
+    assert results.Y_completed.shape == (N, T)
+    assert not jnp.isnan(results.tau), "tau contains NaN values"
+    assert not jnp.any(jnp.isnan(results.Y_completed)), "Y_completed contains NaN values"
+
+
+def test_estimate_float32():
+    N, T = 10, 20
+    with jax.enable_x64(False):
+        Y, W, X, Z, V, _ = generate_data(
+            nobs=N,
+            nperiods=T,
+            unit_fe=True,
+            time_fe=True,
+            X_cov=True,
+            Z_cov=True,
+            V_cov=True,
+            seed=2024,
+            noise_scale=1.0,
+            assignment_mechanism="block",
+            treated_fraction=0.5,
+        )
+        results = estimate(Y=Y, Mask=W, X=X, Z=Z, V=V, K=2, n_lambda=3, max_iter=100, tol=1e-3)
+
+    assert results.Y_completed.dtype == jnp.float32
+    assert results.L.dtype == jnp.float32
+    assert jnp.all(jnp.isfinite(results.Y_completed)), "Y_completed contains NaN or infinite values"
+    assert jnp.isfinite(results.tau), "tau contains NaN or infinite values"
+
+
+def test_complete_matrix_float32():
+    N, T = 10, 20
+    with jax.enable_x64(False):
+        Y, W, X, Z, V, _ = generate_data(
+            nobs=N,
+            nperiods=T,
+            unit_fe=True,
+            time_fe=True,
+            seed=2024,
+            noise_scale=1.0,
+            assignment_mechanism="block",
+            treated_fraction=0.2,
+        )
+        Y_completed, opt_lambda_L, opt_lambda_H = complete_matrix(Y=Y, Mask=W, K=2, n_lambda=3, max_iter=100, tol=1e-3)
+
+    assert Y_completed.dtype == jnp.float32
+    assert jnp.all(jnp.isfinite(Y_completed)), "Y_completed contains NaN or infinite values"
+    assert jnp.isfinite(opt_lambda_L), "lambda_L contains NaN or infinite values"
+    assert jnp.isfinite(opt_lambda_H), "lambda_H contains NaN or infinite values"